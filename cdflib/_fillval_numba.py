@@ -0,0 +1,18 @@
+'''
+Numba kernels used by cdf_to_xarray.  This module imports numba at the top, so it is only imported when one of these
+kernels is actually needed.
+'''
+import numpy as np
+from numba import njit, prange
+
+
+@njit(parallel=True, cache=True)
+def replace_fillvals_with_nan(data, fill):
+    '''
+    Replaces all values equal to fill with NaN in place, comparing and writing in a single parallel loop.
+    :param data: A 1D, native byte order, float array
+    :param fill: The FILLVAL, as a float
+    '''
+    for i in prange(data.size):
+        if data[i] == fill:
+            data[i] = np.nan
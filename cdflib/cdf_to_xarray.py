@@ -1,3 +1,6 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
 import numpy as np
 import xarray as xr
 
@@ -8,6 +11,23 @@ ISTP_TO_XARRAY_ATTRS = {'FIELDNAM': 'standard_name',
                         'LABLAXIS': 'long_name',
                         'UNITS': 'units'}
 
+# CDF_EPOCH values are milliseconds since 0000-01-01, -1.0E31 being the fill value
+CDF_EPOCH_START = np.datetime64('0000-01-01T00:00:00.000', 'ms')
+CDF_EPOCH_FILL = np.datetime64('9999-12-31T23:59:59.999', 'ms')
+UNIX_EPOCH_START = np.datetime64('1970-01-01T00:00:00', 'us')
+
+# CDF data types that can hold a FILLVAL which should become NaN, and the subset of those that are times
+FLOAT_TYPES = frozenset({'CDF_FLOAT', 'CDF_REAL4', 'CDF_DOUBLE', 'CDF_REAL8',
+                         'CDF_TIME_TT2000', 'CDF_EPOCH', 'CDF_EPOCH16'})
+TIME_TYPES = frozenset({'CDF_EPOCH', 'CDF_EPOCH16', 'CDF_TIME_TT2000'})
+
+# Attribute names of the DEPEND_i variables, indexed by i.  A CDF variable has at most 10 dimensions.
+DEPEND_KEYS = tuple(f'DEPEND_{i}' for i in range(11))
+
+# Float arrays with at least this many values have their FILLVALs replaced by the numba kernel, if numba is installed.
+# Below it, importing numba and loading the compiled kernel costs more than np.putmask does.
+NUMBA_FILLVAL_MIN_SIZE = 10_000_000
+
 
 def _find_xarray_plotting_values(var_att_dict):
     '''
@@ -17,13 +37,45 @@ def _find_xarray_plotting_values(var_att_dict):
     :param var_att_dict: A dictionary of attributes that a variable has
     :return:a dictionary of attributes that should be added to the created XArray DataArray
     '''
-    xarray_att_dict = {}
     if not var_att_dict:
-        return xarray_att_dict
-    for key,value in var_att_dict.items():
-        if key in ISTP_TO_XARRAY_ATTRS:
-            xarray_att_dict[ISTP_TO_XARRAY_ATTRS[key]] = value
-    return xarray_att_dict
+        return {}
+    # Loop through the few ISTP attributes we translate, rather than through all of the variable's attributes
+    return {xarray_att: var_att_dict[istp_att] for istp_att, xarray_att in ISTP_TO_XARRAY_ATTRS.items()
+            if istp_att in var_att_dict}
+
+
+@lru_cache(maxsize=None)
+def _load_fillval_kernel():
+    '''
+    Imports the numba kernel that replaces FILLVALs with NaN.  numba is only imported the first time this is called.
+    :return: The kernel, or None if numba is not installed
+    '''
+    try:
+        from cdflib._fillval_numba import replace_fillvals_with_nan
+    except ImportError:
+        return None
+    return replace_fillvals_with_nan
+
+
+def _convert_to_datetime64(data, data_type):
+    '''
+    Converts CDF_EPOCH or CDF_TIME_TT2000 values into a numpy datetime64 array, precise to the microsecond.
+    CDF_EPOCH has no leap seconds, so it is converted directly with numpy.  TT2000 goes through the array based
+    breakdown in cdfepoch, skipping the list of datetime objects that cdfepoch.to_datetime returns by default.
+    :param data: An array of CDF_EPOCH or CDF_TIME_TT2000 values
+    :param data_type: The CDF data type of the values
+    :return: A numpy datetime64[us] array
+    '''
+    if data_type == 'CDF_EPOCH':
+        data = np.asarray(data, dtype=np.float64)
+        fill = data == -1.0E31
+        if np.any((data < 0) & ~fill):
+            # Negative epochs aren't valid dates, leave them to cdfepoch
+            return cdfepoch.to_datetime(data, to_np=True)
+        new_data = CDF_EPOCH_START + np.where(fill, 0, data).astype(np.int64).astype('timedelta64[ms]')
+        new_data[fill] = CDF_EPOCH_FILL
+        return new_data.astype('datetime64[us]')
+    return cdfepoch.to_datetime(np.asarray(data), to_np=True)
 
 
 def _convert_cdf_time_types(data, atts, properties, to_datetime=False, to_unixtime=False):
@@ -32,8 +84,9 @@ def _convert_cdf_time_types(data, atts, properties, to_datetime=False, to_unixti
     # If nothing, ALL CDF_EPOCH16 types are converted to CDF_EPOCH, because xarray can't handle int64s
     '''
 
-    if not hasattr(data, '__len__'):
-        data = [data]
+    # Scalars are wrapped into a 1 element array, so everything below can treat the data as array-like
+    if not isinstance(data, (np.ndarray, list, tuple, str)):
+        data = np.asarray([data])
 
     if to_datetime and to_unixtime:
         print("Cannot convert to both unixtime and datetime.  Continuing with conversion to unixtime.")
@@ -41,15 +94,21 @@ def _convert_cdf_time_types(data, atts, properties, to_datetime=False, to_unixti
 
     # Convert all data in the "data" variable to unixtime or datetime if needed
     data_type = properties['Data_Type_Description']
-    if len(data) == 0 or data_type not in ('CDF_EPOCH', 'CDF_EPOCH16', 'CDF_TIME_TT2000'):
+    if len(data) == 0 or data_type not in TIME_TYPES:
         new_data = data
     else:
         if to_datetime:
-            new_data = cdfepoch.to_datetime(data)
+            if data_type == 'CDF_EPOCH16':
+                new_data = cdfepoch.to_datetime(data)
+            else:
+                new_data = _convert_to_datetime64(data, data_type)
             if 'UNITS' in atts:
                 atts['UNITS']['Data'] = 'Datetime (UTC)'
         elif to_unixtime:
-            new_data = cdfepoch.unixtime(data)
+            if data_type == 'CDF_EPOCH16':
+                new_data = cdfepoch.unixtime(data)
+            else:
+                new_data = (_convert_to_datetime64(data, data_type) - UNIX_EPOCH_START) / np.timedelta64(1, 's')
             if 'UNITS' in atts:
                 atts['UNITS']['Data'] = 'seconds'
         else:
@@ -65,9 +124,9 @@ def _convert_cdf_time_types(data, atts, properties, to_datetime=False, to_unixti
     for att in atts:
         data_type = atts[att]['Data_Type']
         data = atts[att]['Data']
-        if not hasattr(data, '__len__'):
-            data = [data]
-        if len(data) == 0 or data_type not in ('CDF_EPOCH', 'CDF_EPOCH16', 'CDF_TIME_TT2000'):
+        if not isinstance(data, (np.ndarray, list, tuple, str)):
+            data = np.asarray([data])
+        if len(data) == 0 or data_type not in TIME_TYPES:
             new_atts[att] = data
         else:
             if to_datetime:
@@ -98,25 +157,27 @@ def _convert_cdf_to_dicts(filename, to_datetime=False, to_unixtime=False):
     except:
         gatt = {}
 
-    # Gather all information about the CDF file, and store in the below dictionaries
-    variable_data = {}
-    variable_attributes = {}
-    variable_properties = {}
+    # Gather all information about the CDF file, and store in the below dictionaries.
+    # All of the keys are known up front, so the dictionaries are created with them rather than grown in the loop.
+    variable_data = dict.fromkeys(all_cdf_variables)
+    variable_attributes = dict.fromkeys(all_cdf_variables)
+    variable_properties = dict.fromkeys(all_cdf_variables)
 
     for var_name in all_cdf_variables:
-        var_attribute_list = cdf_file.varattsget(var_name)
-        var_data_temp = {}
-        var_atts_temp = {}
-        for att in var_attribute_list:
-            var_atts_temp[att] = (cdf_file.attget(att, var_name))
+        # Read every attribute entry of the variable in one pass, in the same form attget returns them
+        variable_attributes[var_name] = cdf_file.varattsget(var_name, expand='full')
         variable_properties[var_name] = cdf_file.varinq(var_name)
-        # Gather the actual variable data
-        if variable_properties[var_name]['Last_Rec'] < 0:
-            var_data_temp[var_name] = np.array([])
-        else:
-            var_data_temp[var_name] = cdf_file.varget(var_name)
 
-        variable_data[var_name], variable_attributes[var_name] = _convert_cdf_time_types(var_data_temp[var_name], var_atts_temp,
+    # Gather the actual variable data.  Every read opens its own handle on the file, so the reads can be spread
+    # over threads, letting the waits on the file overlap.
+    vars_with_records = [var_name for var_name in all_cdf_variables if variable_properties[var_name]['Last_Rec'] >= 0]
+    with ThreadPoolExecutor() as executor:
+        var_data_temp = dict(zip(vars_with_records, executor.map(cdf_file.varget, vars_with_records)))
+
+    for var_name in all_cdf_variables:
+        var_data = var_data_temp[var_name] if var_name in var_data_temp else np.array([])
+        variable_data[var_name], variable_attributes[var_name] = _convert_cdf_time_types(var_data,
+                                                                                         variable_attributes[var_name],
                                                                                          variable_properties[var_name],
                                                                                          to_datetime=to_datetime,
                                                                                          to_unixtime=to_unixtime)
@@ -129,14 +190,15 @@ def _discover_depend_variables(varatts):
     # Unfortunately, there is no easy way to tell this by looking at the variable ITSELF,
     # you need to look at all variables and see if one points to it.
 
-    list_of_depend_vars = []
+    # A set, since the callers only ever check whether a variable is in here
+    depend_vars = set()
 
-    for v in varatts:
-        depend_keys = [x for x in list(varatts[v].keys()) if x.startswith("DEPEND_")]
-        for d in depend_keys:
-            list_of_depend_vars.append(varatts[v][d])
+    for atts in varatts.values():
+        for k, val in atts.items():
+            if k.startswith("DEPEND_"):
+                depend_vars.add(val)
 
-    return list(set(list_of_depend_vars))
+    return depend_vars
 
 def _discover_uncertainty_variables(varatts):
     # This loops through the variable attributes to discover which variables are the labels of other variables
@@ -145,11 +207,11 @@ def _discover_uncertainty_variables(varatts):
 
     list_of_label_vars = {}
 
-    for v in varatts:
-        if 'DELTA_PLUS_VAR' in varatts[v].keys():
-            list_of_label_vars[varatts[v]['DELTA_PLUS_VAR']] = v
-        if 'DELTA_MINUS_VAR' in varatts[v].keys():
-            list_of_label_vars[varatts[v]['DELTA_MINUS_VAR']] = v
+    for v, atts in varatts.items():
+        if 'DELTA_PLUS_VAR' in atts:
+            list_of_label_vars[atts['DELTA_PLUS_VAR']] = v
+        if 'DELTA_MINUS_VAR' in atts:
+            list_of_label_vars[atts['DELTA_MINUS_VAR']] = v
     return list_of_label_vars
 
 
@@ -161,8 +223,7 @@ def _discover_label_variables(varatts, all_variable_properties, all_variable_dat
     list_of_label_vars = {}
 
     for v in varatts:
-        label_keys = [x for x in list(varatts[v].keys()) if x.startswith("LABL_PTR_")]
-        for lab in label_keys:
+        for lab in [x for x in varatts[v] if x.startswith("LABL_PTR_")]:
             label_dependency = 'DEPEND_' + lab[-1]
             if label_dependency not in varatts[v]:
                 continue
@@ -196,95 +257,102 @@ def _convert_fillvals_to_nan(var_data, var_atts, var_properties):
 
     new_data = var_data
     if 'FILLVAL' in var_atts:
-        if (var_properties['Data_Type_Description'] ==
-                'CDF_FLOAT' or
-                var_properties['Data_Type_Description'] ==
-                'CDF_REAL4' or
-                var_properties['Data_Type_Description'] ==
-                'CDF_DOUBLE' or
-                var_properties['Data_Type_Description'] ==
-                'CDF_REAL8' or
-                var_properties['Data_Type_Description'] ==
-                'CDF_TIME_TT2000' or
-                var_properties['Data_Type_Description'] ==
-                'CDF_EPOCH' or
-                var_properties['Data_Type_Description'] ==
-                'CDF_EPOCH16'):
-
-            if new_data.size > 1:
-                if new_data[new_data == var_atts["FILLVAL"]].size != 0:
-                    new_data[new_data == var_atts["FILLVAL"]] = np.nan
-            else:
-                if new_data == var_atts['FILLVAL']:
+        if var_properties['Data_Type_Description'] in FLOAT_TYPES:
+            fill = np.asarray(var_atts['FILLVAL'])
+            # Nothing is equal to a NaN FILLVAL, so there is nothing to replace
+            if fill.dtype.kind in 'fc' and np.isnan(fill).all():
+                return new_data
+            new_data = np.asarray(new_data)
+            if new_data.dtype.kind == 'M':
+                # CDF_EPOCH and TT2000 times converted to datetime64 get NaT instead.  The FILLVAL attribute went
+                # through the same time conversion, so it is a datetime too.
+                if new_data.size > 0:
+                    mask = new_data == fill.astype(new_data.dtype)
+                    if mask.any():
+                        if not new_data.flags.writeable:
+                            new_data = new_data.copy()
+                        np.putmask(new_data, mask, np.datetime64('NaT'))
+            elif new_data.size > 1:
+                # NaN can't be stored in integer or bool arrays.  Object arrays (datetimes from CDF_EPOCH16) can hold
+                # it, and xarray turns it into NaT.
+                if new_data.dtype.kind not in 'iub':
+                    # The data is no longer copied before it gets here, and may be a read-only buffer
+                    if not new_data.flags.writeable:
+                        new_data = new_data.copy()
+                    # Numba, if installed, can do large arrays in one pass without the temporary mask array
+                    kernel = None
+                    if (new_data.size >= NUMBA_FILLVAL_MIN_SIZE and new_data.dtype.kind == 'f' and
+                            new_data.dtype.isnative and new_data.flags.c_contiguous and
+                            fill.size == 1 and fill.dtype.kind in 'iuf'):
+                        kernel = _load_fillval_kernel()
+                    if kernel is not None:
+                        kernel(new_data.reshape(-1), float(fill.item()))
+                    else:
+                        np.putmask(new_data, new_data == fill, np.nan)
+            elif new_data.size == 1:
+                if new_data.item() == fill.item():
                     new_data = np.array(np.nan)
     return new_data
 
-def _determine_record_dimensions(var_name, var_atts, var_data, var_props, depend_variables,
+def _determine_record_dimensions(var_name, var_atts, var_len, var_props, depend_variables,
                                  all_variable_data, all_variable_properties, created_unlimited_dims):
     '''
     Determines the name of the
     :param var_name:
     :param var_atts:
-    :param var_data:
+    :param var_len: The number of records in the variable's data, i.e. len(var_data)
     :param var_props:
     :param depend_variables:
     :param all_variable_data:
     :param all_variable_properties:
-    :param created_unlimited_dims:
+    :param created_unlimited_dims: The lengths of the "unlimited" dimensions created so far, mapped to their names
     :return:
     '''
 
-    if var_props["Rec_Vary"] and var_props["Last_Rec"] != 0:
-
-        # Check if this variable is itself the dimension
-        if var_name in depend_variables and (len(var_props["Dim_Sizes"]) == 0 or var_props['Last_Rec'] >= 0):
-            if not (len(var_props["Dim_Sizes"]) > 0 and var_props['Last_Rec'] > 0):
-                return var_name, True, False
-            # There might be dimensions listed, but they might not vary
-            if len(var_props["Dim_Sizes"]) > 0:
-                for i in range(0, len(var_props["Dim_Sizes"])):
-                    if var_props["Dim_Vary"][i]:
-                        break
-                else:
-                    return var_name, True, False
-
-        # Check if the dimension is already defined within the attribute section
-        if 'DEPEND_0' in var_atts:
-            depend_0_variable_name = var_atts['DEPEND_0']
-            if depend_0_variable_name not in all_variable_properties:
-                print(f"Warning: Variable {var_name} listed DEPEND_0 as {depend_0_variable_name}, but no"
-                      f" variable by that name was found.")
-            else:
-                if len(all_variable_data[depend_0_variable_name]) == len(var_data):
-                    return depend_0_variable_name, True, False
-        if 'DEPEND_TIME' in var_atts:
-            depend_time_variable_name = var_atts['DEPEND_TIME']
-            if depend_time_variable_name not in all_variable_properties:
-                print(f"Warning: Variable {var_name} listed DEPEND_TIME as {depend_time_variable_name}, but no"
-                      f" variable by that name was found.")
-            else:
-                if len(all_variable_data[depend_time_variable_name]) == len(var_data):
-                    return depend_time_variable_name, True, False
-        '''
-        # If the variable still isn't found, it should be fine to name the dimension after the variable
-        if var_name in depend_variables and not udim_found:
-            var_dims.append(var_name)
-            depend_dimensions[var_name] = len(var_data)
-            udim_found = True
-        '''
-
-        # If none of the above, check if the length of this variable dimension matches a non-specific one that has already been created
-        for udim in created_unlimited_dims:
-            if len(var_data) == created_unlimited_dims[udim]:
-                return udim, False, False
-
-        # If none of the above, create a new dimension variable
-        new_udim_name = 'unlimited' + str(len(created_unlimited_dims))
-        return new_udim_name, False, True
-
-    else:
+    last_rec = var_props["Last_Rec"]
+    if not var_props["Rec_Vary"] or last_rec == 0:
         return None, False, False
 
+    # Check if this variable is itself the dimension.  There might be dimensions listed, but they might not vary
+    num_dims = len(var_props["Dim_Sizes"])
+    if var_name in depend_variables and \
+            (num_dims == 0 or (last_rec > 0 and not any(var_props["Dim_Vary"][:num_dims]))):
+        return var_name, True, False
+
+    # Check if the dimension is already defined within the attribute section
+    if 'DEPEND_0' in var_atts:
+        depend_0_variable_name = var_atts['DEPEND_0']
+        if depend_0_variable_name not in all_variable_properties:
+            print(f"Warning: Variable {var_name} listed DEPEND_0 as {depend_0_variable_name}, but no"
+                  f" variable by that name was found.")
+        else:
+            if len(all_variable_data[depend_0_variable_name]) == var_len:
+                return depend_0_variable_name, True, False
+    if 'DEPEND_TIME' in var_atts:
+        depend_time_variable_name = var_atts['DEPEND_TIME']
+        if depend_time_variable_name not in all_variable_properties:
+            print(f"Warning: Variable {var_name} listed DEPEND_TIME as {depend_time_variable_name}, but no"
+                  f" variable by that name was found.")
+        else:
+            if len(all_variable_data[depend_time_variable_name]) == var_len:
+                return depend_time_variable_name, True, False
+    '''
+    # If the variable still isn't found, it should be fine to name the dimension after the variable
+    if var_name in depend_variables and not udim_found:
+        var_dims.append(var_name)
+        depend_dimensions[var_name] = len(var_data)
+        udim_found = True
+    '''
+
+    # If none of the above, check if the length of this variable dimension matches a non-specific one that has already been created
+    udim = created_unlimited_dims.get(var_len)
+    if udim is not None:
+        return udim, False, False
+
+    # If none of the above, create a new dimension variable
+    new_udim_name = f'unlimited{len(created_unlimited_dims)}'
+    return new_udim_name, False, True
+
 
 def _determine_dimension_names(var_name, var_atts, var_props, depend_variables,
                                all_variable_data, all_variable_properties, created_regular_dims):
@@ -295,46 +363,52 @@ def _determine_dimension_names(var_name, var_atts, var_props, depend_variables,
     :param depend_variables:
     :param all_variable_data:
     :param all_variable_properties:
-    :param created_regular_dims:
+    :param created_regular_dims: The sizes of the standard dimensions created so far, mapped to their names
     :return:
     '''
 
     return_list = []
 
-    if len(var_props["Dim_Sizes"]) != 0 and var_props['Last_Rec'] >= 0:
+    var_dim_sizes = var_props["Dim_Sizes"]
+    var_dim_vary = var_props["Dim_Vary"]
+    var_is_record_dim = var_props["Rec_Vary"] and var_props["Last_Rec"] != 0
+
+    if len(var_dim_sizes) != 0 and var_props['Last_Rec'] >= 0:
         i = 0
-        for dim_size in var_props["Dim_Sizes"]:
-            if not var_props["Dim_Vary"][i]:
+        for dim_size in var_dim_sizes:
+            if not var_dim_vary[i]:
                 continue
 
             i += 1
+            depend_key = DEPEND_KEYS[i]
 
             # Check if the dimension is already defined within the attribute section
-            if 'DEPEND_' + str(i) in var_atts:
-                depend_i_variable_name = var_atts['DEPEND_' + str(i)]
+            if depend_key in var_atts:
+                depend_i_variable_name = var_atts[depend_key]
                 if depend_i_variable_name not in all_variable_properties:
-                    print(f"Warning: Variable {var_name} listed DEPEND_{str(i)} as {depend_i_variable_name}, but no"
+                    print(f"Warning: Variable {var_name} listed {depend_key} as {depend_i_variable_name}, but no"
                           f" variable by that name was found.")
                 else:
-                    if all_variable_properties[depend_i_variable_name]["Dim_Sizes"] and \
-                            (all_variable_properties[depend_i_variable_name]["Dim_Sizes"][0] == var_props["Dim_Sizes"][i - 1]):
+                    depend_props = all_variable_properties[depend_i_variable_name]
+                    dep_dim_sizes = depend_props["Dim_Sizes"]
+                    if dep_dim_sizes and (dep_dim_sizes[0] == var_dim_sizes[i - 1]):
                         if all_variable_data[depend_i_variable_name].size == 0:
-                            print(f"Warning: Variable {var_name} listed DEPEND_{str(i)} as {depend_i_variable_name}"
+                            print(f"Warning: Variable {var_name} listed {depend_key} as {depend_i_variable_name}"
                                   f", but that variable is empty.")
                         else:
-                            if all_variable_properties[depend_i_variable_name]["Rec_Vary"] and all_variable_properties[depend_i_variable_name]["Last_Rec"] != 0:
+                            if depend_props["Rec_Vary"] and depend_props["Last_Rec"] != 0:
                                 return_list.append((depend_i_variable_name+"_dim", dim_size, True, False))
                                 continue
                             else:
                                 return_list.append((depend_i_variable_name, dim_size, True, False))
                                 continue
                     else:
-                        print(f"Warning: Variable {var_name} listed DEPEND_{str(i)} as {depend_i_variable_name}"
+                        print(f"Warning: Variable {var_name} listed {depend_key} as {depend_i_variable_name}"
                               f", but that variable's dimensions do not match {var_name}'s dimensions.")
 
             # Check if the variable is itself a dimension
             if var_name in depend_variables:
-                if var_props["Rec_Vary"] and var_props["Last_Rec"] != 0:
+                if var_is_record_dim:
                     return_list.append((var_name + "_dim", dim_size, True, False))
                     continue
                 else:
@@ -342,27 +416,32 @@ def _determine_dimension_names(var_name, var_atts, var_props, depend_variables,
                     continue
 
             # If none of the above, check if a non-specific dimension name was already created with this dimension length
-            for dim in created_regular_dims:
-                if dim_size == created_regular_dims[dim]:
-                    return_list.append((dim, dim_size, True, False))
-                    break
+            dim = created_regular_dims.get(dim_size)
+            if dim is not None:
+                return_list.append((dim, dim_size, True, False))
             else:
                 # If none of the above, create a new non-specific dimension name
-                return_list.append(('dim'+str(len(created_regular_dims)), dim_size, False, True))
-                created_regular_dims['dim' + str(len(created_regular_dims))] = dim_size
+                new_dim_name = f'dim{len(created_regular_dims)}'
+                return_list.append((new_dim_name, dim_size, False, True))
+                created_regular_dims[dim_size] = new_dim_name
 
     return return_list
 
-def _reformat_variable_dims_and_data(var_dims, var_data):
+def _reformat_variable_dims_and_data(var_dims, var_data, data_shape):
     if len(var_dims) > 0 and var_data is None:
         var_data = np.array([])
 
     # For some reason, there are times when the actual shape of the data doesn't match the dimensions listed.
+    # Work out the shape the data should have first, then reshape once.  Only length 1 axes are dropped or added,
+    # which numpy can always do as a view, without copying the data.
     if var_data is not None:
-        if len(np.array(var_data).shape) > len(var_dims):
-            var_data = np.squeeze(var_data)
-        if len(np.array(var_data).shape) < len(var_dims):
-            var_data = np.expand_dims(var_data, axis=0)
+        target_shape = data_shape
+        if len(target_shape) > len(var_dims):
+            target_shape = tuple(s for s in target_shape if s != 1)
+        if len(target_shape) < len(var_dims):
+            target_shape = (1,) + tuple(target_shape)
+        if target_shape != data_shape:
+            var_data = var_data.reshape(target_shape)
 
     # Check if both dimensions and data are empty, if so, set the dimension to the empty dimension
     if var_data.size == 0 and not len(var_dims):
@@ -376,8 +455,10 @@ def _generate_xarray_data_variables(all_variable_data, all_variable_attributes,
     # Make a list of all of the special variables in the file.  These are variables that are pointed to by
     # other variables.
     depend_variables = _discover_depend_variables(all_variable_attributes)
-    created_unlimited_dims = {}  # These hold the records of the names/lengths of the created "unlimited" dimensions
-    created_regular_dims = {}  # These hold the records of the names/lengths of the standard dimensions of the variable
+    # These hold the names of the created "unlimited" dimensions and standard dimensions, keyed by their length.
+    # A new one is only created when no existing one has the same length, so each length maps to a single name.
+    created_unlimited_dims = {}
+    created_regular_dims = {}
     depend_dimensions = {}  # This will be used after the creation of DataArrays, to determine which are "data" and which are "coordinates"
     created_vars = {}
 
@@ -385,11 +466,14 @@ def _generate_xarray_data_variables(all_variable_data, all_variable_attributes,
 
         var_dims = []
         var_atts = all_variable_attributes[var_name]
-        var_data = np.array(all_variable_data[var_name])
+        # No copy is made if the data is already an array; the shape is reused when reformatting below
+        var_data = np.asarray(all_variable_data[var_name])
+        data_shape = var_data.shape
+        data_len = data_shape[0] if data_shape else 0
         var_props = all_variable_properties[var_name]
 
         # Determine the dimension name of the CDF Records, based on all info in the file
-        record_dim_name, dependency, newly_created = _determine_record_dimensions(var_name, var_atts, var_data,
+        record_dim_name, dependency, newly_created = _determine_record_dimensions(var_name, var_atts, data_len,
                                                                                   var_props, depend_variables,
                                                                                   all_variable_data,
                                                                                   all_variable_properties,
@@ -398,9 +482,9 @@ def _generate_xarray_data_variables(all_variable_data, all_variable_attributes,
         if record_dim_name:
             var_dims.append(record_dim_name)
             if dependency:
-                depend_dimensions[record_dim_name] = len(var_data)
+                depend_dimensions[record_dim_name] = data_len
             if newly_created:
-                created_unlimited_dims[record_dim_name] = len(var_data)
+                created_unlimited_dims[data_len] = record_dim_name
 
         # Determine the dimension names of the labeled Dimensions in the CDF file
         returned_dimension_info = _determine_dimension_names(var_name, var_atts, var_props, depend_variables,
@@ -414,10 +498,10 @@ def _generate_xarray_data_variables(all_variable_data, all_variable_attributes,
                 if dependency:
                     depend_dimensions[dimension_dim_names] = dimension_size
                 if newly_created:
-                    created_regular_dims[dimension_dim_names] = dimension_size
+                    created_regular_dims[dimension_size] = dimension_dim_names
 
         # There might be a few tweaks needed to the data or the dimension labels
-        var_dims, var_data = _reformat_variable_dims_and_data(var_dims, var_data)
+        var_dims, var_data = _reformat_variable_dims_and_data(var_dims, var_data, data_shape)
 
         # Looks for attributes to convert over to the things XArray uses to plot
         additional_variable_attrs = _find_xarray_plotting_values(var_atts)
@@ -440,45 +524,53 @@ def cdf_to_xarray(filename, to_datetime=False, to_unixtime=False, fillval_to_nan
                                                                                                        to_datetime=to_datetime,
                                                                                                        to_unixtime=to_unixtime)
 
-    created_vars, depend_dimensions = _generate_xarray_data_variables(all_variable_data, all_variable_attributes,
-                                                                      all_variable_properties, fillval_to_nan)
-
+    # Find the label and uncertainty variables up front.  This only needs the dicts above, and any attributes
+    # added to the variables while looking for labels then make it into the created variables.
     label_variables = _discover_label_variables(all_variable_attributes, all_variable_properties, all_variable_data)
     uncertainty_variables = _discover_uncertainty_variables(all_variable_attributes)
 
+    # Invert the label variables, so the labels of a coordinate variable can be looked up directly
+    labels_by_variable = {}
+    for lab, labeled_var_name in label_variables.items():
+        labels_by_variable.setdefault(labeled_var_name, []).append(lab)
+
+    created_vars, depend_dimensions = _generate_xarray_data_variables(all_variable_data, all_variable_attributes,
+                                                                      all_variable_properties, fillval_to_nan)
+
     # Determine which dimensions are coordinates vs actual data
     # Variables are considered coordinates if one of the other dimensions depends on them.
     # Otherwise, they are considered data coordinates.
+    # This can only be done once all variables are created, since any later variable may make an earlier one a
+    # coordinate.  The xarray Variables share their data with all_variable_data, so no data is copied here.
     created_coord_vars = {}
     created_data_vars = {}
-    for var_name in created_vars:
+    for var_name, var in created_vars.items():
         if var_name in label_variables:
             # If these are label variables, we'll deal with these later when the DEPEND variables come up
             continue
         elif (var_name in depend_dimensions) or (var_name+'_dim' in depend_dimensions):
             # If these are DEPEND variables, add them to the DataSet coordinates
-            created_coord_vars[var_name] = created_vars[var_name]
+            created_coord_vars[var_name] = var
             # Check if these coordinate variable have associated labels
-            for lab in label_variables:
-                if label_variables[lab] == var_name: # Found one!
-                    if len(created_vars[lab].dims) == len(created_vars[var_name].dims):
-                        if created_vars[lab].size != created_vars[var_name].size:
-                            print(f"Warning, label variable {lab} does not match the expected dimension sizes of {var_name}")
-                        else:
-                            created_vars[lab].dims = created_vars[var_name].dims
+            for lab in labels_by_variable.get(var_name, ()):
+                if len(created_vars[lab].dims) == len(var.dims):
+                    if created_vars[lab].size != var.size:
+                        print(f"Warning, label variable {lab} does not match the expected dimension sizes of {var_name}")
                     else:
-                        created_vars[lab].dims = created_vars[var_name].dims[-1]
-                    # Add the labels to the coordinates as well
-                    created_coord_vars[lab] = created_vars[lab]
+                        created_vars[lab].dims = var.dims
+                else:
+                    created_vars[lab].dims = var.dims[-1]
+                # Add the labels to the coordinates as well
+                created_coord_vars[lab] = created_vars[lab]
         elif var_name in uncertainty_variables:
             # If there is an uncertainty variable, link it to the uncertainty along a dimension
-            if created_vars[var_name].size == created_vars[uncertainty_variables[var_name]].size:
-                created_vars[var_name].dims = created_vars[uncertainty_variables[var_name]].dims
-                created_coord_vars[var_name] = created_vars[var_name]
+            if var.size == created_vars[uncertainty_variables[var_name]].size:
+                var.dims = created_vars[uncertainty_variables[var_name]].dims
+                created_coord_vars[var_name] = var
             else:
-                created_data_vars[var_name] = created_vars[var_name]
+                created_data_vars[var_name] = var
         else:
-            created_data_vars[var_name] = created_vars[var_name]
+            created_data_vars[var_name] = var
 
     # Create the XArray DataSet Object!
     return xr.Dataset(data_vars=created_data_vars, coords=created_coord_vars, attrs=global_attributes)
@@ -132,6 +132,7 @@ class CDF:
         self._num_att = gdr_info['num_attributes']
         self._num_rdim = gdr_info['rvariables_num_dims']
         self._rdim_sizes = gdr_info['rvariables_dim_sizes']
+        self._adr_infos = None
         if (self.cdfversion == 3):
             self._leap_second_updated = gdr_info['leapsecond_updated']
 
@@ -352,19 +353,14 @@ class CDF:
         # Get Correct ADR
         adr_info = None
         if isinstance(attribute, str):
-            for _ in range(0, self._num_att):
-                name, next_adr = self._read_adr_fast(position)
-                if name.strip().lower() == attribute.strip().lower():
-                    adr_info = self._read_adr(position)
-                    if isinstance(entry, str) and adr_info['scope'] == 1:
+            for info in self._get_adr_infos():
+                if info['name'].strip().lower() == attribute.strip().lower():
+                    if isinstance(entry, str) and info['scope'] == 1:
                         # If the user has specified a string entry, they are obviously looking for a variable attribute.
                         # Filter out any global attributes that may have the same name.
-                        adr_info = None
-                        position = next_adr
                         continue
+                    adr_info = info
                     break
-                else:
-                    position = next_adr
 
             if adr_info is None:
                 raise KeyError(f'No attribute {attribute} for entry {entry}')
@@ -595,18 +591,14 @@ class CDF:
         to_np : bool, optional
             If True, return a numpy array.
         """
-        byte_loc = self._first_adr
         return_dict = {}
-        for _ in range(self._num_att):
-            adr_info = self._read_adr(byte_loc)
+        for adr_info in self._get_adr_infos():
 
             if (adr_info['scope'] != 1):
-                byte_loc = adr_info['next_adr_location']
                 continue
             if (adr_info['num_gr_entry'] == 0):
                 if (expand is not False):
                     return_dict[adr_info['name']] = None
-                byte_loc = adr_info['next_adr_location']
                 continue
             if (expand is False):
                 entries = []
@@ -654,7 +646,6 @@ class CDF:
                         return_dict[adr_info['name']] = entries
                 else:
                     return_dict[adr_info['name']] = entries
-            byte_loc = adr_info['next_adr_location']
 
         return return_dict
 
@@ -671,42 +662,19 @@ class CDF:
         type is also returned in a list form as [entry, 'CDF_xxxx'].
         For attributes without any entries, they will also return with
         None value.
+        If expand is entered as 'full', each entry is returned in the
+        same dictionary form as attget returns it, and attributes without
+        an entry for the variable are left out.
 
         Parameters
         ----------
         variable :
-        expand : bool, optional
+        expand : bool or 'full', optional
         to_np: bool, optional
             If True, return a numpy array.
         """
-        if (isinstance(variable, int) and self._num_zvariable > 0 and self._num_rvariable > 0):
-            raise ValueError('This CDF has both r and z variables. Use variable name')
-        if isinstance(variable, str):
-            position = self._first_zvariable
-            num_variables = self._num_zvariable
-            for zVar in [1, 0]:
-                for _ in range(0, num_variables):
-                    name, vdr_next = self._read_vdr_fast(position)
-                    if name.strip().lower() == variable.strip().lower():
-                        vdr_info = self._read_vdr(position)
-                        return self._read_varatts(vdr_info['variable_number'], zVar, expand, to_np=to_np)
-                    position = vdr_next
-                position = self._first_rvariable
-                num_variables = self._num_rvariable
-            raise ValueError(f'No variable by this name: {variable}')
-        elif isinstance(variable, int):
-            if self._num_zvariable > 0:
-                num_variable = self._num_zvariable
-                zVar = True
-            else:
-                num_variable = self._num_rvariable
-                zVar = False
-            if (variable < 0 or variable >= num_variable):
-                raise ValueError(f'No variable by this number: {variable}')
-            return self._read_varatts(variable, zVar, expand, to_np=to_np)
-        else:
-            raise ValueError('Please set variable keyword equal to '
-                             'the name or number of an variable')
+        var_num, zVar = self._find_varatts_entry(variable)
+        return self._read_varatts(var_num, zVar, expand, to_np=to_np)
 
     def _uncompress_file(self, path):
         """
@@ -1071,13 +1039,47 @@ class CDF:
 
         return gdr_info
 
-    def _read_varatts(self, var_num, zVar, expand, to_np=True):
-        byte_loc = self._first_adr
-        return_dict = {}
-        for z in range(0, self._num_att):
-            adr_info = self._read_adr(byte_loc)
+    def _find_varatts_entry(self, variable):
+        """
+        Returns the entry number of a variable (its variable number) and
+        whether it is a zVariable, as used by the attribute entries.
+        """
+        if (isinstance(variable, int) and self._num_zvariable > 0 and self._num_rvariable > 0):
+            raise ValueError('This CDF has both r and z variables. Use variable name')
+        if isinstance(variable, str):
+            position = self._first_zvariable
+            num_variables = self._num_zvariable
+            for zVar in [1, 0]:
+                for _ in range(0, num_variables):
+                    name, vdr_next = self._read_vdr_fast(position)
+                    if name.strip().lower() == variable.strip().lower():
+                        vdr_info = self._read_vdr(position)
+                        return vdr_info['variable_number'], zVar
+                    position = vdr_next
+                position = self._first_rvariable
+                num_variables = self._num_rvariable
+            raise ValueError(f'No variable by this name: {variable}')
+        elif isinstance(variable, int):
+            if self._num_zvariable > 0:
+                num_variable = self._num_zvariable
+                zVar = True
+            else:
+                num_variable = self._num_rvariable
+                zVar = False
+            if (variable < 0 or variable >= num_variable):
+                raise ValueError(f'No variable by this number: {variable}')
+            return variable, zVar
+        else:
+            raise ValueError('Please set variable keyword equal to '
+                             'the name or number of an variable')
+
+    def _read_varatts_aedrs(self, var_num, zVar, to_np=True):
+        """
+        Yields (ADR, AEDR) pairs for every variable attribute, with the AEDR
+        being None if the attribute has no entry for the given variable.
+        """
+        for adr_info in self._get_adr_infos():
             if (adr_info['scope'] == 1):
-                byte_loc = adr_info['next_adr_location']
                 continue
             if (zVar):
                 byte_loc = adr_info['first_z_entry']
@@ -1085,49 +1087,72 @@ class CDF:
             else:
                 byte_loc = adr_info['first_gr_entry']
                 num_entry = adr_info['num_gr_entry']
-            found = 0
+            aedr_info = None
             for _ in range(0, num_entry):
                 entryNum, byte_next = self._read_aedr_fast(byte_loc)
-                if (entryNum != var_num):
-                    byte_loc = byte_next
-                    continue
-                aedr_info = self._read_aedr(byte_loc, to_np=to_np)
-                entryData = aedr_info['entry']
-                if (expand is False):
-                    return_dict[adr_info['name']] = entryData
+                if (entryNum == var_num):
+                    aedr_info = self._read_aedr(byte_loc, to_np=to_np)
+                    break
+                byte_loc = byte_next
+            yield adr_info, aedr_info
+
+    def _read_varatts(self, var_num, zVar, expand, to_np=True):
+        return_dict = {}
+        for adr_info, aedr_info in self._read_varatts_aedrs(var_num, zVar, to_np=to_np):
+            if aedr_info is None:
+                if (expand is not False and expand != 'full'):
+                    return_dict[adr_info['name']] = None
+                continue
+            entryData = aedr_info['entry']
+            if (expand == 'full'):
+                return_dict[adr_info['name']] = self._format_attdata(aedr_info, to_np=to_np)
+            elif (expand is False):
+                return_dict[adr_info['name']] = entryData
+            else:
+                entryWithType = []
+                if (isinstance(entryData, str)):
+                    entryWithType.append(entryData)
                 else:
-                    entryWithType = []
-                    if (isinstance(entryData, str)):
-                        entryWithType.append(entryData)
+                    dataType = aedr_info['data_type']
+                    if (dataType != 31 and dataType != 32 and dataType != 33):
+                        if (len(entryData.tolist()) == 1):
+                            entryWithType.append(entryData.tolist()[0])
+                        else:
+                            entryWithType.append(entryData.tolist())
                     else:
-                        dataType = aedr_info['data_type']
-                        if (dataType != 31 and dataType != 32 and dataType != 33):
-                            if (len(entryData.tolist()) == 1):
-                                entryWithType.append(entryData.tolist()[0])
+                        if (len(entryData.tolist()) == 1):
+                            if (dataType != 33):
+                                entryWithType.append(epoch.CDFepoch.encode(entryData.tolist()[0],
+                                                                           iso_8601=False))
                             else:
-                                entryWithType.append(entryData.tolist())
+                                entryWithType.append(epoch.CDFepoch.encode(entryData.tolist()[0]))
                         else:
-                            if (len(entryData.tolist()) == 1):
-                                if (dataType != 33):
-                                    entryWithType.append(epoch.CDFepoch.encode(entryData.tolist()[0],
-                                                                               iso_8601=False))
-                                else:
-                                    entryWithType.append(epoch.CDFepoch.encode(entryData.tolist()[0]))
+                            if (dataType != 33):
+                                entryWithType.append(epoch.CDFepoch.encode(entryData.tolist(),
+                                                                           iso_8601=False))
                             else:
-                                if (dataType != 33):
-                                    entryWithType.append(epoch.CDFepoch.encode(entryData.tolist(),
-                                                                               iso_8601=False))
-                                else:
-                                    entryWithType.append(epoch.CDFepoch.encode(entryData.tolist()))
-                    entryWithType.append(self._datatype_token(aedr_info['data_type']))
-                    return_dict[adr_info['name']] = entryWithType
-                found = 1
-                break
-            byte_loc = adr_info['next_adr_location']
-            if (found == 0 and expand is not False):
-                return_dict[adr_info['name']] = None
+                                entryWithType.append(epoch.CDFepoch.encode(entryData.tolist()))
+                entryWithType.append(self._datatype_token(aedr_info['data_type']))
+                return_dict[adr_info['name']] = entryWithType
         return return_dict
 
+    def _get_adr_infos(self):
+        """
+        Returns all attribute descriptor records (ADRs), in file order.
+
+        The ADR chain is only walked the first time this is called; the
+        records are cached on the instance afterwards.
+        """
+        if self._adr_infos is None:
+            adr_infos = []
+            byte_loc = self._first_adr
+            for _ in range(0, self._num_att):
+                adr_info = self._read_adr(byte_loc)
+                adr_infos.append(adr_info)
+                byte_loc = adr_info['next_adr_location']
+            self._adr_infos = adr_infos
+        return self._adr_infos
+
     def _read_adr(self, position):
         """
         Read an attribute descriptor record (ADR).
@@ -2004,27 +2029,30 @@ class CDF:
             got_entry_num, next_aedr = self._read_aedr_fast(position)
             if entry_num == got_entry_num:
                 aedr_info = self._read_aedr(position, to_np=to_np)
-                return_dict = {}
-                return_dict['Item_Size'] = self._type_size(aedr_info['data_type'],
-                                                           aedr_info['num_elements'])
-                return_dict['Data_Type'] = self._datatype_token(aedr_info['data_type'])
-
-                return_dict['Num_Items'] = aedr_info['num_elements']
-                return_dict['Data'] = aedr_info['entry']
-                if (aedr_info['data_type'] == 51 or aedr_info['data_type'] == 52):
-                    if 'num_strings' in aedr_info:
-                        return_dict['Num_Items'] = aedr_info['num_strings']
-                        if (aedr_info['num_strings'] > 1):
-                            return_dict['Data'] = aedr_info['entry'].split('\\N ')
-                if not to_np and (aedr_info['data_type'] == 32):
-                    return_dict['Data'] = complex(aedr_info['entry'][0],
-                                                  aedr_info['entry'][1])
-                return return_dict
+                return self._format_attdata(aedr_info, to_np=to_np)
             else:
                 position = next_aedr
 
         raise KeyError('The entry does not exist')
 
+    def _format_attdata(self, aedr_info, to_np=True):
+        return_dict = {}
+        return_dict['Item_Size'] = self._type_size(aedr_info['data_type'],
+                                                   aedr_info['num_elements'])
+        return_dict['Data_Type'] = self._datatype_token(aedr_info['data_type'])
+
+        return_dict['Num_Items'] = aedr_info['num_elements']
+        return_dict['Data'] = aedr_info['entry']
+        if (aedr_info['data_type'] == 51 or aedr_info['data_type'] == 52):
+            if 'num_strings' in aedr_info:
+                return_dict['Num_Items'] = aedr_info['num_strings']
+                if (aedr_info['num_strings'] > 1):
+                    return_dict['Data'] = aedr_info['entry'].split('\\N ')
+        if not to_np and (aedr_info['data_type'] == 32):
+            return_dict['Data'] = complex(aedr_info['entry'][0],
+                                          aedr_info['entry'][1])
+        return return_dict
+
     def _read_vardata(self, vdr_info, epoch=None, starttime=None, endtime=None,
                       startrec=0, endrec=None, record_range_only=False,
                       expand=False, to_np=True):
@@ -0,0 +1,217 @@
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from cdflib import cdfepoch, cdfwrite
+
+xr = pytest.importorskip('xarray')
+from cdflib.cdf_to_xarray import (  # noqa: E402
+    UNIX_EPOCH_START,
+    _convert_fillvals_to_nan,
+    _convert_to_datetime64,
+    cdf_to_xarray,
+)
+
+# cdflib.cdf_to_xarray is shadowed by the function of the same name
+cdf_to_xarray_module = sys.modules['cdflib.cdf_to_xarray']
+
+TT2000_FILL = -9223372036854775808
+
+# CDFepoch.breakdown_tt2000 applies the leap seconds of one element to the whole array, so arrays spanning a leap
+# second (or holding the fill value, which is in 1707) come back with wrong times, e.g. 2010-01-01T00:00 as 23:01.
+BREAKDOWN_TT2000_BUG = pytest.mark.xfail(strict=True, reason='breakdown_tt2000 is wrong for arrays spanning leap seconds')
+
+
+def write_time_cdf(fn, with_fill=True):
+    tt2000 = cdfepoch.compute_tt2000([[2010, 1, 1, 0, 0, 0, 0, 0, 0],
+                                      [2010, 1, 1, 0, 0, 1, 0, 0, 0]])
+    epochs = cdfepoch.compute_epoch([[2010, 1, 1, 0, 0, 0, 0],
+                                     [2010, 1, 1, 0, 0, 1, 0]])
+    if with_fill:
+        tt2000 = tt2000 + [TT2000_FILL]
+        epochs = epochs + [-1.0E31]
+    tfile = cdfwrite.CDF(fn)
+    tfile.write_var({'Variable': 'TT2000', 'Data_Type': 33, 'Num_Elements': 1,
+                     'Rec_Vary': True, 'Dim_Sizes': []},
+                    var_attrs={'FILLVAL': [TT2000_FILL, 'CDF_TIME_TT2000']},
+                    var_data=np.array(tt2000))
+    tfile.write_var({'Variable': 'Epoch', 'Data_Type': 31, 'Num_Elements': 1,
+                     'Rec_Vary': True, 'Dim_Sizes': []},
+                    var_attrs={'FILLVAL': [-1.0E31, 'CDF_EPOCH']},
+                    var_data=np.array(epochs))
+    tfile.close()
+
+
+def test_fillval_to_nat_epoch16(tmp_path):
+    fn = tmp_path / 'epoch16.cdf'
+    fill = complex(-1.0E31, -1.0E31)
+    epochs = cdfepoch.compute_epoch16([[2010, 1, 1, 0, 0, 0, 0, 0, 0, 0],
+                                       [2010, 1, 1, 0, 0, 1, 0, 0, 0, 0]])
+    tfile = cdfwrite.CDF(fn)
+    tfile.write_var({'Variable': 'Epoch16', 'Data_Type': 32, 'Num_Elements': 1,
+                     'Rec_Vary': True, 'Dim_Sizes': []},
+                    var_attrs={'FILLVAL': [fill, 'CDF_EPOCH16']},
+                    var_data=np.array(epochs + [fill]))
+    tfile.close()
+
+    ds = cdf_to_xarray(fn, to_datetime=True, fillval_to_nan=True)
+    values = ds['Epoch16'].values
+    assert values[0] == np.datetime64('2010-01-01T00:00:00')
+    assert values[1] == np.datetime64('2010-01-01T00:00:01')
+    assert np.isnat(values[2])
+
+
+@pytest.mark.parametrize('var_name', ['Epoch', pytest.param('TT2000', marks=BREAKDOWN_TT2000_BUG)])
+def test_fillval_to_nat(tmp_path, var_name):
+    fn = tmp_path / 'times.cdf'
+    write_time_cdf(fn)
+
+    ds = cdf_to_xarray(fn, to_datetime=True, fillval_to_nan=True)
+    expected = np.array(['2010-01-01T00:00:00', '2010-01-01T00:00:01', 'NaT'], dtype='datetime64[us]')
+    np.testing.assert_array_equal(ds[var_name].values, expected)
+
+
+@pytest.mark.parametrize('var_name', ['Epoch', 'TT2000'])
+def test_unixtime(tmp_path, var_name):
+    fn = tmp_path / 'times.cdf'
+    write_time_cdf(fn, with_fill=False)
+
+    ds = cdf_to_xarray(fn, to_unixtime=True)
+    np.testing.assert_allclose(ds[var_name].values, [1262304000.0, 1262304001.0], rtol=0, atol=1e-6)
+
+
+@pytest.mark.parametrize('epochs', [
+    # Whole milliseconds
+    [6.3429523200e13, 6.3429523201e13, 0.0],
+    # Sub-millisecond parts are truncated, like breakdown_epoch does
+    [6.34295232001237e13, 63000000000123.7, 1.5],
+    # The fill value
+    [6.3429523200e13, -1.0E31],
+    # Negative epochs fall back to cdfepoch
+    [6.3429523200e13, -1000.0],
+])
+def test_convert_epoch_to_datetime64(epochs):
+    epochs = np.array(epochs)
+    expected = cdfepoch.to_datetime(epochs, to_np=True)
+    result = _convert_to_datetime64(epochs, 'CDF_EPOCH')
+    assert result.dtype == np.dtype('datetime64[us]')
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_convert_epoch_fill_to_datetime64():
+    result = _convert_to_datetime64(np.array([-1.0E31]), 'CDF_EPOCH')
+    assert result[0] == np.datetime64('9999-12-31T23:59:59.999')
+
+
+@pytest.mark.parametrize('dates, expected', [
+    ([[2010, 1, 1, 0, 0, 0, 0, 0, 0], [2010, 1, 1, 0, 0, 1, 0, 0, 0]],
+     ['2010-01-01T00:00:00', '2010-01-01T00:00:01']),
+    # Nanoseconds are truncated to microseconds
+    ([[2017, 1, 1, 0, 0, 0, 123, 456, 789], [2020, 2, 29, 23, 59, 59, 999, 999, 999]],
+     ['2017-01-01T00:00:00.123456', '2020-02-29T23:59:59.999999']),
+    # Either side of the leap second at the end of 2016
+    pytest.param([[2016, 12, 31, 23, 59, 59, 500, 0, 0], [2017, 1, 1, 0, 0, 0, 123, 456, 789]],
+                 ['2016-12-31T23:59:59.5', '2017-01-01T00:00:00.123456'], marks=BREAKDOWN_TT2000_BUG),
+])
+def test_convert_tt2000_to_datetime64(dates, expected):
+    result = _convert_to_datetime64(np.array(cdfepoch.compute_tt2000(dates)), 'CDF_TIME_TT2000')
+    np.testing.assert_array_equal(result, np.array(expected, dtype='datetime64[us]'))
+
+
+@pytest.mark.parametrize('data_type, values, expected', [
+    ('CDF_EPOCH', cdfepoch.compute_epoch([[2010, 1, 1, 0, 0, 0, 0],
+                                          [2020, 2, 29, 23, 59, 59, 999]]),
+     [1262304000.0, 1583020799.999]),
+    ('CDF_TIME_TT2000', cdfepoch.compute_tt2000([[2017, 1, 1, 0, 0, 0, 0, 0, 0],
+                                                 [2020, 2, 29, 23, 59, 59, 999, 999, 0]]),
+     [1483228800.0, 1583020799.999999]),
+    pytest.param('CDF_TIME_TT2000', cdfepoch.compute_tt2000([[2016, 12, 31, 23, 59, 59, 0, 0, 0],
+                                                             [2017, 1, 1, 0, 0, 0, 0, 0, 0]]),
+                 [1483228799.0, 1483228800.0], marks=BREAKDOWN_TT2000_BUG),
+])
+def test_convert_to_datetime64_unixtime(data_type, values, expected):
+    unixtime = (_convert_to_datetime64(np.array(values), data_type) - UNIX_EPOCH_START) / np.timedelta64(1, 's')
+    np.testing.assert_allclose(unixtime, expected, rtol=0, atol=1e-6)
+
+
+def test_import_does_not_import_numba():
+    code = 'import sys, cdflib, cdflib.cdf_to_xarray; assert "numba" not in sys.modules'
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+def test_fillval_kernel():
+    pytest.importorskip('numba')
+    for dtype in ('f4', 'f8'):
+        data = np.array([1.0, -1.0E31, 2.0, -1.0E31], dtype=dtype)
+        cdf_to_xarray_module._load_fillval_kernel()(data, float(np.asarray(-1.0E31, dtype=dtype)))
+        np.testing.assert_array_equal(data, np.array([1.0, np.nan, 2.0, np.nan], dtype=dtype))
+
+
+@pytest.fixture
+def kernel_calls(monkeypatch):
+    """Lowers the numba size threshold to 0 and records the calls made to a stand-in for the numba kernel"""
+    calls = []
+
+    def kernel(data, fill):
+        calls.append(fill)
+        np.putmask(data, data == fill, np.nan)
+
+    monkeypatch.setattr(cdf_to_xarray_module, 'NUMBA_FILLVAL_MIN_SIZE', 0)
+    monkeypatch.setattr(cdf_to_xarray_module, '_load_fillval_kernel', lambda: kernel)
+    return calls
+
+
+@pytest.mark.parametrize('data, fill', [
+    (np.array([1.0, -1.0E31, 2.0]), -1.0E31),
+    (np.array([[1.0, -1.0E31], [2.0, 3.0]], dtype='f4'), np.float32(-1.0E31)),
+    (np.array([1.0, -1.0, 2.0]), -1),
+])
+def test_fillval_kernel_used(kernel_calls, data, fill):
+    expected = np.where(data == fill, np.nan, data)
+    result = _convert_fillvals_to_nan(data, {'FILLVAL': fill}, {'Data_Type_Description': 'CDF_DOUBLE'})
+    assert kernel_calls == [float(fill)]
+    np.testing.assert_array_equal(result, expected)
+
+
+@pytest.mark.parametrize('data, fill', [
+    # Big endian
+    (np.array([1.0, -1.0E31, 2.0], dtype='>f8'), -1.0E31),
+    # Not contiguous
+    (np.array([1.0, 0.0, -1.0E31, 0.0, 2.0, 0.0])[::2], -1.0E31),
+    # FILLVAL with more than one element
+    (np.array([[1.0, -1.0E31], [-1.0E31, 2.0]]), [-1.0E31, -1.0E31]),
+    # Complex FILLVAL
+    (np.array([1.0, -1.0E31, 2.0]), -1.0E31 + 0j),
+])
+def test_fillval_kernel_fallback(kernel_calls, data, fill):
+    expected = np.where(data == np.asarray(fill), np.nan, data)
+    result = _convert_fillvals_to_nan(data, {'FILLVAL': fill}, {'Data_Type_Description': 'CDF_DOUBLE'})
+    assert kernel_calls == []
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_fillval_kernel_below_threshold(kernel_calls, monkeypatch):
+    monkeypatch.setattr(cdf_to_xarray_module, 'NUMBA_FILLVAL_MIN_SIZE', 4)
+    result = _convert_fillvals_to_nan(np.array([1.0, -1.0E31, 2.0]), {'FILLVAL': -1.0E31},
+                                      {'Data_Type_Description': 'CDF_DOUBLE'})
+    assert kernel_calls == []
+    np.testing.assert_array_equal(result, [1.0, np.nan, 2.0])
+
+
+def test_missing_label_variable_becomes_long_name(tmp_path):
+    fn = tmp_path / 'labels.cdf'
+    tfile = cdfwrite.CDF(fn)
+    tfile.write_var({'Variable': 'channels', 'Data_Type': 4, 'Num_Elements': 1,
+                     'Rec_Vary': False, 'Dim_Sizes': [3]},
+                    var_data=np.array([1, 2, 3]))
+    tfile.write_var({'Variable': 'nrv', 'Data_Type': 45, 'Num_Elements': 1,
+                     'Rec_Vary': False, 'Dim_Sizes': [3]},
+                    var_attrs={'DEPEND_1': 'channels', 'LABL_PTR_1': 'missing_labels'},
+                    var_data=np.array([1.0, 2.0, 3.0]))
+    tfile.close()
+
+    ds = cdf_to_xarray(fn)
+    assert ds['nrv'].attrs['long_name'] == 'missing_labels'
+    assert ds['nrv'].attrs['LABLAXIS'] == 'missing_labels'
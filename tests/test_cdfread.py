@@ -1,7 +1,11 @@
 import os
 import urllib.request
 
+import numpy as np
+import pytest
+
 import cdflib
+from cdflib import cdfwrite
 
 
 def test_read():
@@ -12,3 +16,54 @@ def test_read():
     if not os.path.exists(fname):
         urllib.request.urlretrieve(url, fname)
     cdflib.CDF(fname)
+
+
+@pytest.fixture
+def attribute_cdf(tmp_path):
+    fn = tmp_path / 'attributes.cdf'
+    tfile = cdfwrite.CDF(fn, cdf_spec={'rDim_sizes': [1]})
+    tfile.write_globalattrs({'Project': {0: 'cdflib'},
+                             'Mission': {0: 'test', 1: 'second entry'}})
+    tfile.write_var({'Variable': 'zVar1', 'Data_Type': 45, 'Num_Elements': 1,
+                     'Rec_Vary': True, 'Dim_Sizes': []},
+                    var_attrs={'FILLVAL': -1.0E31, 'UNITS': 'nT', 'VALIDMIN': [0, 'CDF_INT4']},
+                    var_data=np.array([1.0, 2.0, 3.0]))
+    tfile.write_var({'Variable': 'zVar2', 'Data_Type': 4, 'Num_Elements': 1,
+                     'Rec_Vary': True, 'Dim_Sizes': []},
+                    var_attrs={'UNITS': 'counts', 'DEPEND_0': 'zVar1'},
+                    var_data=np.array([1, 2, 3]))
+    tfile.write_var({'Variable': 'rVar1', 'Var_Type': 'rvariable', 'Data_Type': 12, 'Num_Elements': 1,
+                     'Rec_Vary': True, 'Dim_Sizes': [], 'Dim_Vary': [True]},
+                    var_attrs={'FILLVAL': [255, 'CDF_UINT1'], 'UNITS': 'flag'},
+                    var_data=np.array([0, 1, 2]))
+    tfile.close()
+    return cdflib.CDF(fn)
+
+
+def assert_entries_equal(entries, expected):
+    assert entries.keys() == expected.keys()
+    for name, entry in entries.items():
+        assert entry.keys() == expected[name].keys()
+        for key, value in entry.items():
+            np.testing.assert_array_equal(value, expected[name][key])
+
+
+@pytest.mark.parametrize('variable', ['zVar1', 'zVar2', 'rVar1'])
+def test_varattsget_expand_full(attribute_cdf, variable):
+    expected = {att: attribute_cdf.attget(att, variable) for att in attribute_cdf.varattsget(variable)}
+    assert_entries_equal(attribute_cdf.varattsget(variable, expand='full'), expected)
+
+
+def test_attget_with_cached_adrs(attribute_cdf):
+    # Fill the ADR cache before any attget call
+    attribute_cdf.globalattsget()
+    attribute_cdf.varattsget('zVar1')
+    for _ in range(2):
+        assert attribute_cdf.attget('Project', 0)['Data'] == 'cdflib'
+        assert attribute_cdf.attget('Mission', 1)['Data'] == 'second entry'
+        assert attribute_cdf.attget('UNITS', 'zVar1')['Data'] == 'nT'
+        assert attribute_cdf.attget('UNITS', 'zVar2')['Data'] == 'counts'
+        assert attribute_cdf.attget('UNITS', 'rVar1')['Data'] == 'flag'
+        assert attribute_cdf.attget('FILLVAL', 'zVar1')['Data'] == -1.0E31
+        assert attribute_cdf.attget('FILLVAL', 'rVar1')['Data'] == 255
+        assert attribute_cdf.attget('DEPEND_0', 'zVar2')['Data'] == 'zVar1'